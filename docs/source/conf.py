@@ -60,6 +60,13 @@ intersphinx_mapping = {
     'nibabel': ('https://nipy.org/nibabel/', None),
     'numpy': ('https://numpy.org/doc/stable/', None),
 }
+# Bound the time spent fetching each inventory, so that an unreachable server
+# does not stall the build for minutes
+intersphinx_timeout = int(os.environ.get('TORCHIO_INTERSPHINX_TIMEOUT', '10'))
+# Set TORCHIO_NO_INTERSPHINX to build the docs without fetching inventories,
+# e.g. offline. Links to external documentation will not be generated
+if os.environ.get('TORCHIO_NO_INTERSPHINX'):
+    intersphinx_mapping = {}
 
 # Add any paths that contain templates here, relative to this directory.
 templates_path = ['_templates']
@@ -221,8 +228,10 @@ epub_title = project
 epub_exclude_files = ['search.html']
 
 # CopyButton configuration
+# The pattern is evaluated in the browser, anchored at the start of each line.
+# The trailing space is shared by all the prompts, so it is matched only once
 copybutton_prompt_text = (
-    r'>>> |\.\.\. |\$ |In \[\d*\]: | {2,5}\.\.\.: | {5,8}: '  # noqa: B950,FS003
+    r'(?:>>>|\.\.\.|\$|In \[\d*\]:| {2,5}\.\.\.:| {5,8}:) '  # noqa: FS003
 )
 copybutton_prompt_is_regexp = True
 
@@ -236,6 +245,9 @@ sphinx_gallery_conf = {
     'examples_dirs': '../examples',  # example scripts
     'gallery_dirs': 'auto_examples',  # where to save gallery generated output
     'matplotlib_animations': True,
+    # Run the examples in parallel, using the number of jobs passed to
+    # sphinx-build with -j unless TORCHIO_SPHX_PARALLEL is set
+    'parallel': int(os.environ.get('TORCHIO_SPHX_PARALLEL', '0')) or True,
 }
 
 # autosummary_generate = True  # Turn on sphinx.ext.autosummary
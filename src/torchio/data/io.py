@@ -1,6 +1,7 @@
 import warnings
 from pathlib import Path
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
@@ -333,7 +334,27 @@ def sitk_to_nib(
     image: sitk.Image,
     keepdim: bool = False,
 ) -> Tuple[np.ndarray, np.ndarray]:
-    data = sitk.GetArrayFromImage(image).transpose()
+    data = sitk.GetArrayFromImage(image)
+    return _sitk_array_to_nib(data, image, keepdim)
+
+
+def _sitk_to_nib_without_copy(image: sitk.Image) -> Tuple[np.ndarray, np.ndarray]:
+    """Like :func:`sitk_to_nib`, but the array aliases the buffer of the image.
+
+    The array is writable and keeps the image alive, so the image must not be
+    used by the caller anymore. Used by :class:`~torchio.transforms.Resample`
+    for the images created by its filters.
+    """
+    data = np.asarray(_SitkImageBuffer(image))
+    return _sitk_array_to_nib(data, image, keepdim=False)
+
+
+def _sitk_array_to_nib(
+    data: np.ndarray,
+    image: sitk.Image,
+    keepdim: bool,
+) -> Tuple[np.ndarray, np.ndarray]:
+    data = data.transpose()
     data = check_uint_to_int(data)
     num_components = image.GetNumberOfComponentsPerPixel()
     if num_components == 1:
@@ -354,12 +375,41 @@ def sitk_to_nib(
     return data, affine
 
 
+class _SitkImageBuffer:
+    """Expose the buffer of a SimpleITK image to NumPy without copying it.
+
+    Arrays created from this object keep a reference to it, and therefore to
+    the image, so the buffer is not freed while the array is in use. The
+    array is writable, so the image should not be used anywhere else.
+    """
+
+    def __init__(self, image: sitk.Image):
+        self.image = image
+        self.view = sitk.GetArrayViewFromImage(image)
+        interface = dict(self.view.__array_interface__)
+        pointer, _ = interface['data']
+        interface['data'] = pointer, False  # not read-only
+        self.__array_interface__ = interface
+
+
 def get_ras_affine_from_sitk(
     sitk_object: Union[sitk.Image, sitk.ImageFileReader],
 ) -> np.ndarray:
-    spacing = np.array(sitk_object.GetSpacing())
-    direction_lps = np.array(sitk_object.GetDirection())
-    origin_lps = np.array(sitk_object.GetOrigin())
+    return get_ras_affine_from_sitk_metadata(
+        sitk_object.GetSpacing(),
+        sitk_object.GetDirection(),
+        sitk_object.GetOrigin(),
+    )
+
+
+def get_ras_affine_from_sitk_metadata(
+    spacing: Sequence[float],
+    direction_lps: Sequence[float],
+    origin_lps: Sequence[float],
+) -> np.ndarray:
+    spacing = np.array(spacing)
+    direction_lps = np.array(direction_lps)
+    origin_lps = np.array(origin_lps)
     direction_length = len(direction_lps)
     if direction_length == 9:
         rotation_lps = direction_lps.reshape(3, 3)
@@ -101,11 +101,15 @@ class WeightedSampler(RandomSampler):
         probability_map: torch.Tensor,
         subject: Subject,
     ) -> np.ndarray:
-        # Using float32 can create cdf with maximum very far from 1, e.g. 0.92!
-        data = probability_map[0].numpy().astype(np.float64)
+        # Sums must be float64, as float32 sums can create a cdf with maximum
+        # very far from 1, e.g. 0.92! Only the values of narrow maps are kept
+        # in float32, as wider values could underflow or overflow
+        data = probability_map[0].numpy()
+        dtype = np.float32 if data.dtype.itemsize <= 4 else np.float64
+        data = data.astype(dtype)
         assert data.ndim == 3
         self.clear_probability_borders(data, self.patch_size)
-        total = data.sum()
+        total = data.sum(dtype=np.float64)
         if total == 0:
             half_patch_size = tuple(n // 2 for n in self.patch_size)
             message = (
@@ -149,29 +153,34 @@ class WeightedSampler(RandomSampler):
         # The dots represent removed probabilities, x mark possible locations
         crop_ini = patch_size // 2
         crop_fin = (patch_size - 1) // 2
-        crop_i, crop_j, crop_k = crop_ini
-        probability_map[:crop_i, :, :] = 0
-        probability_map[:, :crop_j, :] = 0
-        probability_map[:, :, :crop_k] = 0
-
-        # The call tolist() is very important. Using np.uint16 as negative
-        # index will not work because e.g. -np.uint16(2) == 65534
-        crop_i, crop_j, crop_k = crop_fin.tolist()
-        if crop_i:
-            probability_map[-crop_i:, :, :] = 0
-        if crop_j:
-            probability_map[:, -crop_j:, :] = 0
-        if crop_k:
-            probability_map[:, :, -crop_k:] = 0
+        # The call tolist() is very important. Using np.uint16 in index
+        # arithmetic will not work because e.g. -np.uint16(2) == 65534
+        ini_i, ini_j, ini_k = crop_ini.tolist()
+        shape = np.array(probability_map.shape)
+        # Use explicit end indices instead of negative ones, as -0 == 0
+        fin_i, fin_j, fin_k = (shape - crop_fin.astype(int)).tolist()
+
+        # Only the border slabs are written
+        probability_map[:ini_i, :, :] = 0
+        probability_map[:, :ini_j, :] = 0
+        probability_map[:, :, :ini_k] = 0
+        probability_map[fin_i:, :, :] = 0
+        probability_map[:, fin_j:, :] = 0
+        probability_map[:, :, fin_k:] = 0
 
     @staticmethod
     def get_cumulative_distribution_function(
         probability_map: np.ndarray,
     ) -> np.ndarray:
         """Return the cumulative distribution function of a probability map."""
-        flat_map = probability_map.flatten()
-        flat_map_normalized = flat_map / flat_map.sum()
-        cdf = np.cumsum(flat_map_normalized)
+        # The map is not sorted, as inverse transform sampling works with any
+        # ordering of the voxels. Normalizing after the cumulative sum avoids
+        # allocating intermediate flattened and normalized copies of the map.
+        # The CDF is kept in float64 and on the CPU: float32 cumulative sums
+        # over large volumes drift far from 1, biasing the sampling towards
+        # the last voxels, and patches are cropped on the CPU anyway
+        cdf = np.cumsum(probability_map.ravel(), dtype=np.float64)
+        cdf /= cdf[-1]
         return cdf
 
     def extract_patch(  # type: ignore[override]
@@ -180,7 +189,15 @@ class WeightedSampler(RandomSampler):
         probability_map: np.ndarray,
         cdf: np.ndarray,
     ) -> Subject:
-        i, j, k = self.get_random_index_ini(probability_map, cdf)
+        center = self.sample_probability_map(probability_map, cdf)
+        return self.extract_patch_from_center(subject, center)
+
+    def extract_patch_from_center(
+        self,
+        subject: Subject,
+        center: np.ndarray,
+    ) -> Subject:
+        i, j, k = self.get_index_ini(center)
         index_ini = i, j, k
         si, sj, sk = self.patch_size
         patch_size = si, sj, sk
@@ -197,6 +214,9 @@ class WeightedSampler(RandomSampler):
         cdf: np.ndarray,
     ) -> np.ndarray:
         center = self.sample_probability_map(probability_map, cdf)
+        return self.get_index_ini(center)
+
+    def get_index_ini(self, center: np.ndarray) -> np.ndarray:
         assert np.all(center >= 0)
         # See self.clear_probability_borders
         index_ini = center - self.patch_size // 2
@@ -208,9 +228,15 @@ class WeightedSampler(RandomSampler):
         cls,
         probability_map: np.ndarray,
         cdf: np.ndarray,
+        num_samples: Optional[int] = None,
     ) -> np.ndarray:
         """Inverse transform sampling.
 
+        If :attr:`num_samples` is ``None``, the index of a single voxel is
+        returned. Otherwise, an array of shape :math:`(N, D)` is returned,
+        where :math:`N` is :attr:`num_samples` and :math:`D` is the number of
+        dimensions of the probability map.
+
         Example:
             >>> probability_map = np.array(
             ...    ((0,0,1,1,5,2,1,1,0),
@@ -228,17 +254,19 @@ class WeightedSampler(RandomSampler):
         """  # noqa: B950
         # Get first value larger than random number ensuring the random number
         # is not exactly 0 (see https://github.com/fepegar/torchio/issues/510)
-        random_number = max(MIN_FLOAT_32, torch.rand(1).item()) * cdf[-1]
+        size = 1 if num_samples is None else num_samples
+        random_numbers = torch.rand(size).clamp(min=MIN_FLOAT_32).numpy()
+        random_numbers = random_numbers * cdf[-1]
 
-        random_location_index = np.searchsorted(cdf, random_number)
+        random_location_indices = np.searchsorted(cdf, random_numbers)
 
-        center = np.unravel_index(
-            random_location_index,
+        centers = np.unravel_index(
+            random_location_indices,
             probability_map.shape,
         )
 
-        probability = probability_map[center]
-        if probability <= 0:
+        probabilities = probability_map[centers]
+        if np.any(probabilities <= 0):
             message = (
                 'Error retrieving probability in weighted sampler.'
                 ' Please report this issue at'
@@ -246,4 +274,7 @@ class WeightedSampler(RandomSampler):
             )
             raise RuntimeError(message)
 
-        return np.array(center)
+        centers_array = np.stack(centers, axis=-1)
+        if num_samples is None:
+            return centers_array[0]
+        return centers_array
@@ -1,12 +1,23 @@
+import gzip
+import os
+import shutil
 import urllib.parse
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import torch
 
 from ...data import LabelMap
 from ...data import ScalarImage
-from ...download import download_and_extract_archive
+from ...download import download_url
 from ...utils import compress
 from .mni import SubjectMNI
 
 
+# Larger than the default buffer of shutil.copyfileobj to make fewer system calls
+BUFFER_SIZE = 1024 * 1024
+
 TISSUES_2008 = {
     1: 'Cerebro-spinal fluid',
     2: 'Gray Matter',
@@ -68,23 +79,12 @@ class Colin27(SubjectMNI):
         self.filename = f'{self.name}.zip'
         self.url = urllib.parse.urljoin(self.url_dir, self.filename)
         if not self.download_root.is_dir():
-            download_and_extract_archive(
+            download_url(
                 self.url,
-                download_root=self.download_root,
+                self.download_root,
                 filename=self.filename,
             )
-
-            # Fix label map (https://github.com/fepegar/torchio/issues/220)
-            if version == 2008:
-                path = self.download_root / 'colin27_cls_tal_hires.nii'
-                cls_image = LabelMap(path)
-                cls_image.set_data(cls_image.data.round().byte())
-                cls_image.save(path)
-
-            (self.download_root / self.filename).unlink()
-            for path in self.download_root.glob('*.nii'):
-                compress(path)
-                path.unlink()
+            self._extract_and_compress()
 
         try:
             subject_dict = self.get_subject_dict(
@@ -98,6 +98,49 @@ class Colin27(SubjectMNI):
             )
         super().__init__(subject_dict)
 
+    def _extract_and_compress(self) -> None:
+        archive_path = self.download_root / self.filename
+        with zipfile.ZipFile(archive_path) as archive:
+            names = archive.namelist()
+        # Each member is extracted and compressed in its own thread, so that
+        # decompression, compression and disk writes of different images
+        # overlap. zlib releases the GIL while processing large buffers
+        num_workers = min(len(names), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+            list(executor.map(self._extract_and_compress_member, names))
+        archive_path.unlink()
+
+    def _extract_and_compress_member(self, name: str) -> None:
+        archive_path = self.download_root / self.filename
+        label_name = 'colin27_cls_tal_hires.nii'
+        needs_fix = self.version == 2008 and name == label_name
+        is_top_level_image = name.endswith('.nii') and Path(name).name == name
+        with zipfile.ZipFile(archive_path) as archive:
+            if is_top_level_image and not needs_fix:
+                # Compress while decompressing, so the uncompressed image is
+                # never written to disk and read back
+                compressed_path = (self.download_root / name).with_suffix('.nii.gz')
+                with archive.open(name) as f_in:
+                    with gzip.open(compressed_path, 'wb') as f_out:
+                        shutil.copyfileobj(f_in, f_out, length=BUFFER_SIZE)
+                return
+            path = Path(archive.extract(name, self.download_root))
+        if path.suffix != '.nii':
+            return
+
+        # Fix label map (https://github.com/fepegar/torchio/issues/220)
+        if needs_fix:
+            cls_image = LabelMap(path)
+            data = cls_image.data
+            # Round in place to avoid allocating another float volume
+            if data.is_floating_point():
+                data.round_()
+            cls_image.set_data(data.to(torch.uint8))
+            cls_image.save(path)
+
+        compress(path)
+        path.unlink()
+
     def get_subject_dict(self, download_root, extension):
         if self.version == 1998:
             subject_dict = Colin1998.get_subject_dict(download_root, extension)
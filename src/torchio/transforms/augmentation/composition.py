@@ -61,21 +61,19 @@ class Compose(Transform):
             warn: Issue a warning if some transforms are not invertible.
         """
         transforms = []
-        for transform in self.transforms:
+        for transform in reversed(self.transforms):
             if transform.is_invertible():
                 transforms.append(transform.inverse())
             elif warn:
                 message = f'Skipping {transform.name} as it is not invertible'
                 warnings.warn(message, RuntimeWarning, stacklevel=2)
-        transforms.reverse()
-        result = Compose(transforms)
         if not transforms and warn:
             warnings.warn(
                 'No invertible transforms found',
                 RuntimeWarning,
                 stacklevel=2,
             )
-        return result
+        return Compose(transforms)
 
 
 class OneOf(RandomTransform):
@@ -104,12 +102,13 @@ class OneOf(RandomTransform):
     def __init__(self, transforms: TypeTransformsDict, **kwargs):
         super().__init__(parse_input=False, **kwargs)
         self.transforms_dict = self._get_transforms_dict(transforms)
+        # Computed once instead of for every subject
+        self._transforms = tuple(self.transforms_dict.keys())
+        self._weights = torch.tensor(list(self.transforms_dict.values()))
 
     def apply_transform(self, subject: Subject) -> Subject:
-        weights = torch.Tensor(list(self.transforms_dict.values()))
-        index = torch.multinomial(weights, 1)
-        transforms = list(self.transforms_dict.keys())
-        transform = transforms[index]
+        index = int(torch.multinomial(self._weights, 1).item())
+        transform = self._transforms[index]
         transformed = transform(subject)
         return transformed  # type: ignore[return-value]
 
@@ -155,5 +154,5 @@ class OneOf(RandomTransform):
                 f' but they are "{probabilities}"'
             )
             raise ValueError(message)
-        for transform, probability in transforms_dict.items():
-            transforms_dict[transform] = probability / probabilities.sum()
+        probabilities /= probabilities.sum()
+        transforms_dict.update(zip(transforms_dict, probabilities.tolist()))
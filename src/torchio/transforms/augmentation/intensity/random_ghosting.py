@@ -114,7 +114,7 @@ class RandomGhosting(RandomTransform, IntensityTransform):
     ) -> Tuple:
         ng_min, ng_max = num_ghosts_range
         num_ghosts = torch.randint(ng_min, ng_max + 1, (1,)).item()
-        axis = axes[torch.randint(0, len(axes), (1,))]
+        axis = axes[int(torch.randint(0, len(axes), (1,)).item())]
         intensity = self.sample_uniform(*intensity_range)
         return num_ghosts, axis, intensity
 
@@ -1,6 +1,12 @@
-from collections import defaultdict
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Optional
 from typing import Sequence
 from typing import Tuple
 from typing import Union
@@ -8,6 +14,7 @@ from typing import Union
 import numpy as np
 import SimpleITK as sitk
 import torch
+from deprecated import deprecated
 
 from .. import RandomTransform
 from ... import FourierTransform
@@ -16,6 +23,14 @@ from ....data.io import nib_to_sitk
 from ....data.subject import Subject
 from ....typing import TypeTripletFloat
 
+# Environment variable to set the number of threads used to simulate motion
+NUM_THREADS_VARIABLE = 'TORCHIO_MOTION_NTHREADS'
+
+unused_helper_message = (
+    'This method is not used by the motion transforms anymore and will be'
+    ' removed in the future'
+)
+
 
 class RandomMotion(RandomTransform, IntensityTransform, FourierTransform):
     r"""Add random MRI motion artifact.
@@ -48,6 +63,12 @@ class RandomMotion(RandomTransform, IntensityTransform, FourierTransform):
 
     .. warning:: Large numbers of movements lead to longer execution times for
         3D images.
+
+    .. note:: The channels and movements can be resampled in parallel threads
+        by setting the environment variable ``TORCHIO_MOTION_NTHREADS`` to the
+        desired number of threads. By default, a single thread is used, which
+        is typically preferable when the transform is already being run in
+        multiple processes, e.g., by a :class:`~torch.utils.data.DataLoader`.
     """
 
     def __init__(
@@ -73,19 +94,24 @@ class RandomMotion(RandomTransform, IntensityTransform, FourierTransform):
         )
 
     def apply_transform(self, subject: Subject) -> Subject:
-        arguments: Dict[str, dict] = defaultdict(dict)
-        for name, image in self.get_images_dict(subject).items():
-            params = self.get_params(
+        images_dict = self.get_images_dict(subject)
+        params = {
+            name: self.get_params(
                 self.degrees_range,
                 self.translation_range,
                 self.num_transforms,
                 is_2d=image.is_2d(),
             )
-            times_params, degrees_params, translation_params = params
-            arguments['times'][name] = times_params
-            arguments['degrees'][name] = degrees_params
-            arguments['translation'][name] = translation_params
-            arguments['image_interpolation'][name] = self.image_interpolation
+            for name, image in images_dict.items()
+        }
+        arguments: Dict[str, dict] = {
+            key: {name: image_params[i] for name, image_params in params.items()}
+            for i, key in enumerate(('times', 'degrees', 'translation'))
+        }
+        arguments['image_interpolation'] = dict.fromkeys(
+            images_dict,
+            self.image_interpolation,
+        )
         transform = Motion(**self.add_include_exclude(arguments))
         transformed = transform(subject)
         assert isinstance(transformed, Subject)
@@ -100,26 +126,25 @@ class RandomMotion(RandomTransform, IntensityTransform, FourierTransform):
         is_2d: bool = False,
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         # If perturbation is 0, time intervals between movements are constant
-        degrees_params = self.get_params_array(
-            degrees_range,
-            num_transforms,
-        )
-        translation_params = self.get_params_array(
-            translation_range,
-            num_transforms,
-        )
+        # Sample rotations and translations into a single buffer
+        params = torch.empty(2 * num_transforms, 3)
+        degrees_params = params[:num_transforms].uniform_(*degrees_range)
+        degrees_params = degrees_params.numpy()
+        translation_params = params[num_transforms:].uniform_(*translation_range)
+        translation_params = translation_params.numpy()
         if is_2d:  # imagine sagittal (1, A, S)
             degrees_params[:, :-1] = 0  # rotate around Z axis only
             translation_params[:, 2] = 0  # translate in XY plane only
         step = 1 / (num_transforms + 1)
         times = torch.arange(0, 1, step)[1:]
-        noise = torch.FloatTensor(num_transforms)
+        noise = torch.empty(num_transforms)
         noise.uniform_(-step * perturbation, step * perturbation)
         times += noise
         times_params = times.numpy()
         return times_params, degrees_params, translation_params
 
     @staticmethod
+    @deprecated(version='0.19.10', reason=unused_helper_message)
     def get_params_array(nums_range: Tuple[float, float], num_transforms: int):
         tensor = torch.FloatTensor(num_transforms, 3).uniform_(*nums_range)
         return tensor.numpy()
@@ -179,52 +204,56 @@ class Motion(IntensityTransform, FourierTransform):
                 translation = self.translation[image_name]
                 times = self.times[image_name]
                 image_interpolation = self.image_interpolation[image_name]
-            result_arrays = []
-            for channel in image.data:
-                sitk_image = nib_to_sitk(
-                    channel[np.newaxis],
-                    image.affine,
-                    force_3d=True,
-                )
-                transforms = self.get_rigid_transforms(
-                    np.asarray(degrees),
-                    np.asarray(translation),
-                    sitk_image,
-                )
-                assert isinstance(image_interpolation, str)
-                transformed_channel = self.add_artifact(
-                    sitk_image,
-                    transforms,
-                    np.asarray(times),
-                    image_interpolation,
-                )
-                result_arrays.append(transformed_channel)
-            result = np.stack(result_arrays)
-            image.set_data(torch.as_tensor(result))
+            assert isinstance(image_interpolation, str)
+            sitk_images = [
+                nib_to_sitk(channel[np.newaxis], image.affine, force_3d=True)
+                for channel in image.data
+            ]
+            # All channels share the same geometry and therefore the same motion
+            transforms = self.get_rigid_transforms(
+                np.asarray(degrees),
+                np.asarray(translation),
+            )
+            resampled_images = self._resample_channels(
+                sitk_images,
+                transforms,
+                image_interpolation,
+            )
+            result = self._add_artifact_to_channels(
+                resampled_images,
+                np.asarray(times),
+            )
+            image.set_data(result)
         return subject
 
     def get_rigid_transforms(
         self,
         degrees_params: np.ndarray,
         translation_params: np.ndarray,
-        image: sitk.Image,
+        image: Optional[sitk.Image] = None,
     ) -> List[sitk.Euler3DTransform]:
-        center_ijk = np.array(image.GetSize()) / 2
-        center_lps = image.TransformContinuousIndexToPhysicalPoint(center_ijk)
-        identity = np.eye(4)
-        matrices = [identity]
-        for degrees, translation in zip(degrees_params, translation_params):
-            radians = np.radians(degrees).tolist()
+        if image is not None:
+            message = (
+                'The "image" argument is deprecated and will be removed in the'
+                ' future, as the transforms do not depend on the image'
+            )
+            warnings.warn(message, DeprecationWarning, stacklevel=2)
+        # A new Euler transform is the identity, so it needs no conversion
+        transforms = [sitk.Euler3DTransform()]
+        # Convert all the parameters at once instead of once per movement
+        radians_all = np.radians(degrees_params).tolist()
+        translations_all = np.asarray(translation_params).tolist()
+        # The transforms used to be converted to matrices and back, which
+        # discarded their center, so the rotations are around the origin
+        for radians, translation in zip(radians_all, translations_all):
             motion = sitk.Euler3DTransform()
-            motion.SetCenter(center_lps)
             motion.SetRotation(*radians)
-            motion.SetTranslation(translation.tolist())
-            motion_matrix = self.transform_to_matrix(motion)
-            matrices.append(motion_matrix)
-        transforms = [self.matrix_to_transform(m) for m in matrices]
+            motion.SetTranslation(translation)
+            transforms.append(motion)
         return transforms
 
     @staticmethod
+    @deprecated(version='0.19.10', reason=unused_helper_message)
     def transform_to_matrix(transform: sitk.Euler3DTransform) -> np.ndarray:
         matrix = np.eye(4)
         rotation = np.array(transform.GetMatrix()).reshape(3, 3)
@@ -233,6 +262,7 @@ class Motion(IntensityTransform, FourierTransform):
         return matrix
 
     @staticmethod
+    @deprecated(version='0.19.10', reason=unused_helper_message)
     def matrix_to_transform(matrix: np.ndarray) -> sitk.Euler3DTransform:
         transform = sitk.Euler3DTransform()
         rotation = matrix[:3, :3].flatten().tolist()
@@ -246,25 +276,66 @@ class Motion(IntensityTransform, FourierTransform):
         transforms: Sequence[sitk.Euler3DTransform],
         interpolation: str,
     ) -> List[sitk.Image]:
-        floating = reference = image
-        default_value = np.float64(sitk.GetArrayViewFromImage(image).min())
+        return self._resample_channels([image], transforms, interpolation)[0]
+
+    def _resample_channels(
+        self,
+        images: Sequence[sitk.Image],
+        transforms: Sequence[sitk.Euler3DTransform],
+        interpolation: str,
+    ) -> List[List[sitk.Image]]:
+        # All the channels share the same geometry
+        reference = images[0]
+        default_values = [
+            float(sitk.GetArrayViewFromImage(image).min()) for image in images
+        ]
+        interpolator = self.get_sitk_interpolator(interpolation)
         transforms = transforms[1:]  # first is identity
-        images = [image]  # first is identity
-        for transform in transforms:
-            interpolator = self.get_sitk_interpolator(interpolation)
-            resampler = sitk.ResampleImageFilter()
-            resampler.SetInterpolator(interpolator)
-            resampler.SetReferenceImage(reference)
-            resampler.SetOutputPixelType(sitk.sitkFloat32)
-            resampler.SetDefaultPixelValue(default_value)
+        thread_data = threading.local()
+        # Reduce the threads used by each filter if transforms are resampled
+        # concurrently, to avoid oversubscribing the CPU
+        default_threads = sitk.ProcessObject.GetGlobalDefaultNumberOfThreads()
+        threads_per_filter = max(1, default_threads // _get_num_threads())
+
+        def resample(channel_and_transform) -> sitk.Image:
+            channel, transform = channel_and_transform
+            # The filter is configured once and reused for all the transforms
+            # resampled by the same thread, but never shared across threads
+            resampler = getattr(thread_data, 'resampler', None)
+            if resampler is None:
+                resampler = sitk.ResampleImageFilter()
+                resampler.SetInterpolator(interpolator)
+                resampler.SetReferenceImage(reference)
+                resampler.SetOutputPixelType(sitk.sitkFloat32)
+                resampler.SetNumberOfThreads(threads_per_filter)
+                thread_data.resampler = resampler
+            resampler.SetDefaultPixelValue(default_values[channel])
             resampler.SetTransform(transform)
-            resampled = resampler.Execute(floating)
-            images.append(resampled)
-        return images
+            return resampler.Execute(images[channel])
+
+        # A single pool is used for all the channels and movements
+        pairs = [
+            (channel, transform)
+            for channel in range(len(images))
+            for transform in transforms
+        ]
+        resampled = _thread_map(resample, pairs)
+        num_transforms = len(transforms)
+        channels_images = []
+        for channel, image in enumerate(images):
+            ini = channel * num_transforms
+            fin = ini + num_transforms
+            # The first image is the identity
+            channels_images.append([image, *resampled[ini:fin]])
+        return channels_images
 
     @staticmethod
-    def sort_spectra(spectra: List[torch.Tensor], times: np.ndarray):
-        """Use original spectrum to fill the center of k-space."""
+    def sort_spectra(spectra: list, times: np.ndarray):
+        """Use original spectrum to fill the center of k-space.
+
+        The list is modified in place. It may contain the spectra or their
+        indices in a batch of spectra.
+        """
         num_spectra = len(spectra)
         if np.any(times > 0.5):
             index = np.where(times > 0.5)[0].min()
@@ -272,27 +343,110 @@ class Motion(IntensityTransform, FourierTransform):
             index = num_spectra - 1
         spectra[0], spectra[index] = spectra[index], spectra[0]
 
+    @deprecated(version='0.19.10', reason=unused_helper_message)
     def add_artifact(
         self,
         image: sitk.Image,
         transforms: Sequence[sitk.Euler3DTransform],
         times: np.ndarray,
         interpolation: str,
-    ):
-        images = self.resample_images(image, transforms, interpolation)
-        spectra = []
-        for image in images:
-            array = sitk.GetArrayFromImage(image).transpose()  # sitk to np
-            spectrum = self.fourier_transform(torch.from_numpy(array))
-            spectra.append(spectrum)
-        self.sort_spectra(spectra, times)
-        result_spectrum = torch.empty_like(spectra[0])
-        last_index = result_spectrum.shape[2]
+    ) -> torch.Tensor:
+        images = self._resample_channels([image], transforms, interpolation)
+        return self._add_artifact_to_channels(images, times)[0]
+
+    def _add_artifact_to_channels(
+        self,
+        images: Sequence[Sequence[sitk.Image]],
+        times: np.ndarray,
+    ) -> torch.Tensor:
+        """Combine the k-space of the resampled images of each channel.
+
+        Args:
+            images: For each channel, a list with the image followed by its
+                versions resampled with each motion transform.
+            times: Times at which the motions happen.
+
+        Returns:
+            Tensor with the artifacted channels.
+        """
+        num_channels = len(images)
+        num_spectra = len(images[0])
+        # Use views of the SimpleITK buffers, whose axes are in reverse order
+        # with respect to NumPy's, so that the only copy is the one into the
+        # stack. The stack is single precision even if the input image is not,
+        # as that halves the memory traffic of the FFTs
+        arrays = [
+            sitk.GetArrayViewFromImage(image)
+            for channel_images in images
+            for image in channel_images
+        ]
+        shape = num_channels, num_spectra, *arrays[0].shape
+        stack = np.empty(shape, dtype=np.float32)
+        for array, destination in zip(arrays, stack.reshape(-1, *shape[2:])):
+            destination[:] = array
+        spectra_order = list(range(num_spectra))
+        self.sort_spectra(spectra_order, times)
+        # The last NumPy axis is the first spatial axis in SimpleITK order
+        last_index = stack.shape[2]
         indices = (last_index * times).astype(int).tolist()
         indices.append(last_index)
+        # Find which spectrum fills each hyperplane along the last axis, so
+        # that the k-space can be assembled with a single gather
+        owners = torch.empty(last_index, dtype=torch.long)
         ini = 0
-        for spectrum, fin in zip(spectra, indices):
-            result_spectrum[..., ini:fin] = spectrum[..., ini:fin]
+        for spectrum_index, fin in zip(spectra_order, indices):
+            owners[ini:fin] = spectrum_index
             ini = fin
-        result_image = self.inv_fourier_transform(result_spectrum).real.float()
-        return result_image
+        if (owners == owners[0]).all():
+            # The k-space comes from a single image, e.g., for 2D images, which
+            # have a single hyperplane, so the FFTs can be skipped
+            return torch.from_numpy(stack[:, int(owners[0])]).permute(0, 3, 2, 1)
+        # Compute the spectra of all the channels and motions at once. The
+        # images are real, so only half of each spectrum is computed
+        spatial_dims = -3, -2, -1
+        spectra = self.real_fourier_transform(torch.from_numpy(stack), spatial_dims)
+        # The spectra are not shifted, so the owners are shifted instead
+        owners = owners.roll(-(last_index // 2))
+        # The assembled spectrum is not Hermitian, and only the real part of
+        # its inverse transform is kept. That is the inverse transform of its
+        # Hermitian part, the mean of the spectra owning each frequency and
+        # its opposite, which can be assembled from the halves of the spectra
+        opposite = -torch.arange(last_index) % last_index
+        owners = torch.stack((owners, owners[opposite]))
+        owners = owners.reshape(1, 2, -1, 1, 1)
+        owners = owners.expand(num_channels, 2, *spectra.shape[2:])
+        result_spectrum = spectra.gather(1, owners).mean(dim=1)
+        result = self.inv_real_fourier_transform(
+            result_spectrum,
+            stack.shape[-3:],
+            spatial_dims,
+        )
+        return result.permute(0, 3, 2, 1)  # sitk to np
+
+
+def _get_num_threads() -> int:
+    value = os.environ.get(NUM_THREADS_VARIABLE, '1')
+    try:
+        num_threads = int(value)
+    except ValueError:
+        num_threads = 0
+    if num_threads < 1:
+        message = (
+            f'The environment variable {NUM_THREADS_VARIABLE} must be a'
+            f' positive integer, but its value is "{value}"'
+        )
+        raise ValueError(message)
+    return num_threads
+
+
+def _thread_map(function: Callable, iterable: Iterable) -> list:
+    """Apply a function to all items, in parallel threads if requested.
+
+    SimpleITK filters release the GIL, so threads can be used to resample
+    independent channels and movements concurrently.
+    """
+    num_threads = _get_num_threads()
+    if num_threads <= 1:
+        return [function(item) for item in iterable]
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        return list(executor.map(function, iterable))
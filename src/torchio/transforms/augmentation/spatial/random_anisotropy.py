@@ -70,7 +70,7 @@ class RandomAnisotropy(RandomTransform):
         axes: Tuple[int, ...],
         downsampling_range: Tuple[float, float],
     ) -> Tuple[int, float]:
-        axis = axes[torch.randint(0, len(axes), (1,))]
+        axis = axes[int(torch.randint(0, len(axes), (1,)).item())]
         downsampling = self.sample_uniform(*downsampling_range)
         return axis, downsampling
 
@@ -1,4 +1,6 @@
-import numpy as np
+from typing import Sequence
+
+import scipy.fft
 import torch
 
 
@@ -14,8 +16,8 @@ class FourierTransform:
         except (ModuleNotFoundError, AttributeError):
             import torch
 
-            transformed = np.fft.fftn(tensor)
-            fshift = np.fft.fftshift(transformed)
+            transformed = scipy.fft.fftn(tensor)
+            fshift = scipy.fft.fftshift(transformed)
             return torch.from_numpy(fshift)
 
     @staticmethod
@@ -29,6 +31,48 @@ class FourierTransform:
         except (ModuleNotFoundError, AttributeError):
             import torch
 
-            f_ishift = np.fft.ifftshift(tensor)
-            img_back = np.fft.ifftn(f_ishift)
+            f_ishift = scipy.fft.ifftshift(tensor)
+            img_back = scipy.fft.ifftn(f_ishift)
             return torch.from_numpy(img_back)
+
+    @staticmethod
+    def real_fourier_transform(
+        tensor: torch.Tensor,
+        dim: Sequence[int],
+    ) -> torch.Tensor:
+        """Compute the non-redundant half of the spectrum of a real tensor.
+
+        The spectrum is not shifted. The last dimension in :attr:`dim` is
+        halved.
+        """
+        try:
+            import torch.fft
+
+            return torch.fft.rfftn(tensor, dim=dim)
+        except (ModuleNotFoundError, AttributeError):
+            import torch
+
+            return torch.from_numpy(scipy.fft.rfftn(tensor, axes=dim))
+
+    @staticmethod
+    def inv_real_fourier_transform(
+        tensor: torch.Tensor,
+        shape: Sequence[int],
+        dim: Sequence[int],
+    ) -> torch.Tensor:
+        """Inverse of :meth:`real_fourier_transform`.
+
+        Args:
+            tensor: Half spectrum, assumed to be Hermitian.
+            shape: Size of the output along the dimensions in :attr:`dim`.
+            dim: Dimensions to transform.
+        """
+        try:
+            import torch.fft
+
+            return torch.fft.irfftn(tensor, s=shape, dim=dim)
+        except (ModuleNotFoundError, AttributeError):
+            import torch
+
+            transformed = scipy.fft.irfftn(tensor, s=shape, axes=dim)
+            return torch.from_numpy(transformed)
@@ -43,15 +43,24 @@ class Crop(BoundsTransform):
         index_ini = low
         index_fin = np.array(sample.spatial_shape) - high
         for image in self.get_images(sample):
-            new_origin = nib.affines.apply_affine(image.affine, index_ini)
-            new_affine = image.affine.copy()
-            new_affine[:3, 3] = new_origin
+            new_affine = self._get_cropped_affine(image.affine, index_ini)
             i0, j0, k0 = index_ini
             i1, j1, k1 = index_fin
             image.set_data(image.data[:, i0:i1, j0:j1, k0:k1].clone())
             image.affine = new_affine
         return sample
 
+    @staticmethod
+    def _get_cropped_affine(affine: np.ndarray, index_ini) -> np.ndarray:
+        """Return the affine of an image cropped from the given index.
+
+        Negative indices can be used for padded images.
+        """
+        new_origin = nib.affines.apply_affine(affine, index_ini)
+        new_affine = affine.copy()
+        new_affine[:3, 3] = new_origin
+        return new_affine
+
     def inverse(self):
         from .pad import Pad
 
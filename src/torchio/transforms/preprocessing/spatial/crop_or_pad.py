@@ -1,16 +1,21 @@
 import warnings
+from numbers import Number
+from typing import List
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
 from typing import Union
 
 import numpy as np
+import torch
 
 from ... import SpatialTransform
+from ....data.image import Image
 from ....data.subject import Subject
 from ....utils import parse_spatial_shape
 from ...transform import TypeSixBounds
 from ...transform import TypeTripletInt
+from .bounds_transform import BoundsTransform
 from .crop import Crop
 from .pad import Pad
 
@@ -151,13 +156,9 @@ class CropOrPad(SpatialTransform):
             >>> CropOrPad._get_six_bounds_parameters(p)
             (2, 2, 0, 0, 4, 3)
         """  # noqa: B950
-        parameters = parameters / 2
-        result = []
-        for number in parameters:
-            ini, fin = int(np.ceil(number)), int(np.floor(number))
-            result.extend([ini, fin])
-        i1, i2, j1, j2, k1, k2 = result
-        return i1, i2, j1, j2, k1, k2
+        # Integer division of Python integers avoids NumPy scalar operations
+        i, j, k = (int(n) for n in parameters.tolist())
+        return i - i // 2, i // 2, j - j // 2, j // 2, k - k // 2, k // 2
 
     def _compute_cropping_padding_from_shapes(
         self,
@@ -277,11 +278,76 @@ class CropOrPad(SpatialTransform):
     def apply_transform(self, subject: Subject) -> Subject:
         subject.check_consistent_space()
         padding_params, cropping_params = self.compute_crop_or_pad(subject)
-        padding_kwargs = {'padding_mode': self.padding_mode}
+        # Pad and Crop are not applied, but instantiated to validate their
+        # arguments and to be added to the history of the subject
+        pad = crop = None
+        transforms: List[BoundsTransform] = []
         if padding_params is not None:
-            pad = Pad(padding_params, **padding_kwargs)
-            subject = pad(subject)  # type: ignore[assignment]
+            pad = Pad(padding_params, padding_mode=self.padding_mode)
+            transforms.append(pad)
         if cropping_params is not None:
             crop = Crop(cropping_params)
-            subject = crop(subject)  # type: ignore[assignment]
+            transforms.append(crop)
+        if not transforms:
+            return subject
+        # Calling the transforms would draw a random number each to decide
+        # whether to apply them. The numbers are drawn anyway, so that the
+        # random state after this transform is not modified
+        for _ in transforms:
+            torch.rand(1)
+        no_bounds = 6 * (0,)
+        padding = np.array(no_bounds if padding_params is None else padding_params)
+        cropping = np.array(
+            no_bounds if cropping_params is None else cropping_params,
+        )
+        # Each image is cropped and padded at once, instead of creating a
+        # padded copy of the subject and cropping it afterwards
+        for image in subject.get_images(intensity_only=False):
+            self._crop_or_pad_image(image, padding, cropping, pad)
+        for transform in transforms:
+            transform.add_transform_to_subject_history(subject)
         return subject
+
+    def _crop_or_pad_image(
+        self,
+        image: Image,
+        padding: np.ndarray,
+        cropping: np.ndarray,
+        pad: Optional[Pad],
+    ) -> None:
+        pad_ini, pad_fin = padding[::2], padding[1::2]
+        crop_ini, crop_fin = cropping[::2], cropping[1::2]
+        # Index of the first voxel of the output in the input image
+        index_ini = crop_ini - pad_ini
+        new_affine = Crop._get_cropped_affine(image.affine, index_ini)
+        data = image.data
+        if isinstance(self.padding_mode, Number):
+            # Copy the voxels that are kept into an array filled with the
+            # padding value, so each voxel is written only once
+            shape = np.array(image.spatial_shape)
+            new_shape = shape + pad_ini + pad_fin - crop_ini - crop_fin
+            new_data = torch.full(
+                (data.shape[0], *new_shape.tolist()),
+                self.padding_mode,
+                dtype=data.dtype,
+            )
+            source_ini = np.maximum(index_ini, 0)
+            target_ini = np.maximum(-index_ini, 0)
+            size = np.minimum(shape - source_ini, new_shape - target_ini)
+            source = [slice(i, i + n) for i, n in zip(source_ini, size)]
+            target = [slice(i, i + n) for i, n in zip(target_ini, size)]
+            new_data[(slice(None), *target)] = data[(slice(None), *source)]
+        else:
+            # Padding and cropping do not commute for these modes, as the
+            # padded values depend on the voxels that are cropped
+            padded = data
+            if pad is not None:
+                pad._check_image_padding_mode(image)
+                paddings = (0, 0), *zip(pad_ini.tolist(), pad_fin.tolist())
+                kwargs = pad._get_numpy_kwargs()
+                padded = torch.as_tensor(np.pad(data, paddings, **kwargs))  # type: ignore[call-overload]  # noqa: B950
+            i0, j0, k0 = crop_ini
+            i1, j1, k1 = np.array(padded.shape[1:]) - crop_fin
+            new_data = padded[:, i0:i1, j0:j1, k0:k1].clone()
+        image.set_data(new_data)
+        image.affine = new_affine
@@ -3,14 +3,15 @@ from numbers import Number
 from typing import Dict
 from typing import Union
 
-import nibabel as nib
 import numpy as np
 import torch
 
+from ....data.image import Image
 from ....data.image import LabelMap
 from ....data.subject import Subject
 from .bounds_transform import BoundsTransform
 from .bounds_transform import TypeBounds
+from .crop import Crop
 
 
 class Pad(BoundsTransform):
@@ -83,30 +84,31 @@ class Pad(BoundsTransform):
         assert self.bounds_parameters is not None
         low = self.bounds_parameters[::2]
         for image in self.get_images(subject):
-            if isinstance(image, LabelMap) and self.padding_mode == 'mean':
-                message = (
-                    'Padding mode "mean" might create non-integer values in label maps'
-                )
-                warnings.warn(message, RuntimeWarning, stacklevel=2)
-            new_origin = nib.affines.apply_affine(image.affine, -np.array(low))
-            new_affine = image.affine.copy()
-            new_affine[:3, 3] = new_origin
-            kwargs: Dict[str, Union[str, float]]
-            if isinstance(self.padding_mode, Number):
-                kwargs = {
-                    'mode': 'constant',
-                    'constant_values': self.padding_mode,
-                }
-            else:
-                kwargs = {'mode': self.padding_mode}
+            self._check_image_padding_mode(image)
+            new_affine = Crop._get_cropped_affine(image.affine, -np.array(low))
             pad_params = self.bounds_parameters
             paddings = (0, 0), pad_params[:2], pad_params[2:4], pad_params[4:]
-            padded = np.pad(image.data, paddings, **kwargs)  # type: ignore[call-overload]  # noqa: B950
+            padded = np.pad(image.data, paddings, **self._get_numpy_kwargs())  # type: ignore[call-overload]  # noqa: B950
             image.set_data(torch.as_tensor(padded))
             image.affine = new_affine
         return subject
 
-    def inverse(self):
-        from .crop import Crop
+    def _check_image_padding_mode(self, image: Image) -> None:
+        if isinstance(image, LabelMap) and self.padding_mode == 'mean':
+            message = (
+                'Padding mode "mean" might create non-integer values in label maps'
+            )
+            warnings.warn(message, RuntimeWarning, stacklevel=3)
 
+    def _get_numpy_kwargs(self) -> Dict[str, Union[str, float]]:
+        """Return the keyword arguments for :func:`numpy.pad`."""
+        if isinstance(self.padding_mode, Number):
+            return {
+                'mode': 'constant',
+                'constant_values': self.padding_mode,
+            }
+        else:
+            return {'mode': self.padding_mode}
+
+    def inverse(self):
         return Crop(self.padding)
@@ -1,7 +1,16 @@
+import hashlib
+import os
+import tempfile
+import threading
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from numbers import Number
 from pathlib import Path
+from typing import Any
+from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Sized
 from typing import Tuple
 from typing import Union
@@ -9,18 +18,25 @@ from typing import Union
 import numpy as np
 import SimpleITK as sitk
 import torch
+import torch.nn.functional as F  # noqa: N812
 
 from ... import SpatialTransform
 from ....data.image import Image
 from ....data.image import ScalarImage
+from ....data.io import _sitk_to_nib_without_copy
+from ....data.io import get_ras_affine_from_sitk_metadata
 from ....data.io import get_sitk_metadata_from_ras_affine
-from ....data.io import sitk_to_nib
 from ....data.subject import Subject
 from ....typing import TypePath
 from ....typing import TypeTripletFloat
 
 
 TypeSpacing = Union[float, Tuple[float, float, float]]
+TORCH_INTERPOLATIONS = 'linear', 'nearest'
+# NumPy or SimpleITK, used by many transforms, cannot handle these types
+UNSUPPORTED_OUTPUT_DTYPES = torch.float16, torch.bfloat16
+# Output spacing, or output size, origin, spacing and direction
+TypeConstantTarget = Tuple[Optional[TypeTripletFloat], Optional[tuple]]
 
 
 class Resample(SpatialTransform):
@@ -51,6 +67,32 @@ class Resample(SpatialTransform):
         label_interpolation: See :ref:`Interpolation`.
         scalars_only: Apply only to instances of :class:`~torchio.ScalarImage`.
             Used internally by :class:`~torchio.transforms.RandomAnisotropy`.
+        cache_dir: If not ``None``, resampled images are saved in this
+            directory and loaded from it, memory-mapped, when the same image
+            is resampled again into the same space, e.g., in the next training
+            epoch. Cached images are identified by a hash of their voxels,
+            their spatial metadata, the interpolation and the output space.
+            The directory is never cleaned up.
+        backend: Library used to resample the images. If ``'sitk'``,
+            SimpleITK is used. If ``'torch'``, scalar images resampled with
+            ``'linear'`` or ``'nearest'`` interpolation are resampled with
+            PyTorch, on the device that stores the image data. A GPU is not
+            chosen automatically, as CUDA cannot be initialized in forked
+            workers of a :class:`~torch.utils.data.DataLoader`. The results
+            might differ slightly from those obtained with SimpleITK, e.g.,
+            by one for images with integer types. With oblique targets, a few
+            voxels might differ more, as positions exactly between two voxels
+            might be rounded differently by nearest neighbor interpolation,
+            and positions on the border might be considered outside the
+            image by linear interpolation. Other images are resampled with
+            SimpleITK.
+        output_dtype: If not ``None``, resampled instances of
+            :class:`~torchio.ScalarImage` are cast to this type, e.g.,
+            :attr:`torch.float32` to halve the memory used by images stored
+            in double precision and the time spent by later transforms
+            reading them. Note that this conversion might be lossy. Half
+            precision types are not supported, as they cannot be handled by
+            the transforms that use NumPy or SimpleITK.
         **kwargs: See :class:`~torchio.transforms.Transform` for additional
             keyword arguments.
 
@@ -76,6 +118,14 @@ class Resample(SpatialTransform):
         t1_resampled = resample(subject.t1)
         subject.add_image(t1_resampled, 'Downsampled')
         subject.plot()
+
+    .. note:: The resampled images are not stored in pinned (page-locked)
+        memory. Tensors created in the workers of a
+        :class:`~torch.utils.data.DataLoader` are moved to shared memory before
+        reaching the main process, so pinning them here would not make
+        transfers to the GPU faster. Use ``pin_memory=True`` in the
+        :class:`~torch.utils.data.DataLoader` instead, which pins whole
+        batches in the main process.
     """  # noqa: B950
 
     def __init__(
@@ -85,6 +135,9 @@ class Resample(SpatialTransform):
         label_interpolation: str = 'nearest',
         pre_affine_name: Optional[str] = None,
         scalars_only: bool = False,
+        cache_dir: Optional[TypePath] = None,
+        backend: str = 'sitk',
+        output_dtype: Optional[torch.dtype] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -97,19 +150,46 @@ class Resample(SpatialTransform):
         )
         self.pre_affine_name = pre_affine_name
         self.scalars_only = scalars_only
+        self.cache_dir = cache_dir
+        if backend not in ('sitk', 'torch'):
+            message = f'Backend must be "sitk" or "torch", not "{backend}"'
+            raise ValueError(message)
+        self.backend = backend
+        if output_dtype is not None and not isinstance(output_dtype, torch.dtype):
+            message = f'Output type must be a torch.dtype, not {type(output_dtype)}'
+            raise TypeError(message)
+        if output_dtype in UNSUPPORTED_OUTPUT_DTYPES:
+            message = f'Output type {output_dtype} is not supported'
+            raise ValueError(message)
+        self.output_dtype = output_dtype
+        self._parsed_target: Optional[Tuple[Any, TypeConstantTarget]] = None
+        self._filters = threading.local()
         self.args_names = [
             'target',
             'image_interpolation',
             'label_interpolation',
             'pre_affine_name',
             'scalars_only',
+            'cache_dir',
+            'backend',
+            'output_dtype',
         ]
 
+    def __getstate__(self):
+        # SimpleITK filters and thread-local data cannot be pickled
+        state = self.__dict__.copy()
+        del state['_filters']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._filters = threading.local()
+
     @staticmethod
     def _parse_spacing(spacing: TypeSpacing) -> Tuple[float, float, float]:
-        result: Iterable
-        if isinstance(spacing, Iterable) and len(spacing) == 3:
-            result = spacing
+        is_string = isinstance(spacing, str)
+        if isinstance(spacing, Iterable) and not is_string and len(spacing) == 3:
+            result = tuple(spacing)
         elif isinstance(spacing, Number):
             result = 3 * (spacing,)
         else:
@@ -118,10 +198,10 @@ class Resample(SpatialTransform):
                 f' or a sequence of positive numbers, not {type(spacing)}'
             )
             raise ValueError(message)
-        if np.any(np.array(spacing) <= 0):
+        if any(s <= 0 for s in result):
             message = f'Spacing must be strictly positive, not "{spacing}"'
             raise ValueError(message)
-        return result
+        return result  # type: ignore[return-value]
 
     @staticmethod
     def check_affine(affine_name: str, image: Image):
@@ -157,6 +237,12 @@ class Resample(SpatialTransform):
             assert self.pre_affine_name is not None  # for mypy
             self.check_affine_key_presence(self.pre_affine_name, subject)
 
+        images: List[Image] = []
+        resamplers: List[sitk.ResampleImageFilter] = []
+        floating_images: List[sitk.Image] = []
+        cache_keys: List[Optional[str]] = []
+        cached_images: List[Image] = []
+        cached_results: List[Tuple[np.ndarray, np.ndarray]] = []
         for image in self.get_images(subject):
             # If the current image is the reference, don't resample it
             if self.target is image:
@@ -191,20 +277,275 @@ class Resample(SpatialTransform):
 
             floating_sitk = image.as_sitk(force_3d=True)
 
-            resampler = sitk.ResampleImageFilter()
+            resampler = self._get_resampler(len(resamplers))
             resampler.SetInterpolator(interpolator)
+            self._set_resampler_output_space(resampler, floating_sitk, subject)
+
+            use_torch = self._use_torch(image, interpolation, resampler)
+            cache_key = None
+            if self.cache_dir is not None:
+                cache_key = self._get_cache_key(
+                    resampler,
+                    floating_sitk,
+                    use_torch,
+                )
+                cached = self._load_from_cache(cache_key)
+                if cached is not None:
+                    cached_images.append(image)
+                    cached_results.append(cached)
+                    continue
+
+            if use_torch:
+                result = self._resample_with_torch(
+                    image.data,
+                    floating_sitk,
+                    resampler,
+                    interpolation,
+                )
+                if cache_key is not None:
+                    self._save_to_cache(cache_key, *result)
+                cached_images.append(image)
+                cached_results.append(result)
+                continue
+
+            images.append(image)
+            resamplers.append(resampler)
+            floating_images.append(floating_sitk)
+            cache_keys.append(cache_key)
+
+        results = self._resample_all(resamplers, floating_images)
+        for cache_key, (array, affine) in zip(cache_keys, results):
+            if cache_key is not None:
+                self._save_to_cache(cache_key, array, affine)
+        images.extend(cached_images)
+        results.extend(cached_results)
+        for image, (array, affine) in zip(images, results):
+            tensor = torch.as_tensor(array)
+            if self.output_dtype is not None and isinstance(image, ScalarImage):
+                tensor = tensor.to(self.output_dtype)
+            image.set_data(tensor)
+            image.affine = affine
+        return subject
+
+    def _get_resampler(self, index: int) -> sitk.ResampleImageFilter:
+        # Filters are reused across calls. Each thread has its own filters, and
+        # each image of a subject its own filter, as images are resampled
+        # concurrently. All the parameters are set again before each use
+        resamplers = getattr(self._filters, 'resamplers', None)
+        if resamplers is None:
+            resamplers = self._filters.resamplers = []
+        while len(resamplers) <= index:
+            resamplers.append(sitk.ResampleImageFilter())
+        return resamplers[index]
+
+    @staticmethod
+    def _resample_one(
+        resampler: sitk.ResampleImageFilter,
+        floating_sitk: sitk.Image,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        resampled = resampler.Execute(floating_sitk)
+        # The resampled image is not used anywhere else, so its buffer can be
+        # wrapped instead of copied
+        return _sitk_to_nib_without_copy(resampled)
+
+    def _resample_all(
+        self,
+        resamplers: List[sitk.ResampleImageFilter],
+        floating_images: List[sitk.Image],
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        num_workers = min(len(resamplers), os.cpu_count() or 1)
+        default_threads = sitk.ProcessObject.GetGlobalDefaultNumberOfThreads()
+        if num_workers <= 1:
+            # The filter might have been used concurrently in a previous call
+            for resampler in resamplers:
+                resampler.SetNumberOfThreads(default_threads)
+            return [
+                self._resample_one(resampler, floating_sitk)
+                for resampler, floating_sitk in zip(resamplers, floating_images)
+            ]
+        # SimpleITK filters release the GIL, so the images can be resampled
+        # concurrently. The threads used by each filter are reduced to avoid
+        # oversubscribing the CPU
+        threads_per_filter = max(1, default_threads // num_workers)
+        for resampler in resamplers:
+            resampler.SetNumberOfThreads(threads_per_filter)
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            results = executor.map(self._resample_one, resamplers, floating_images)
+            return list(results)
+
+    def _use_torch(
+        self,
+        image: Image,
+        interpolation: str,
+        resampler: sitk.ResampleImageFilter,
+    ) -> bool:
+        if self.backend != 'torch' or not isinstance(image, ScalarImage):
+            return False
+        if interpolation not in TORCH_INTERPOLATIONS:
+            return False
+        # Coordinates along singleton dimensions cannot be normalized
+        sizes = image.spatial_shape + tuple(resampler.GetSize())
+        return min(sizes) > 1
+
+    @staticmethod
+    def _resample_with_torch(
+        tensor: torch.Tensor,
+        floating_sitk: sitk.Image,
+        resampler: sitk.ResampleImageFilter,
+        interpolation: str,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        input_matrix = _get_index_to_physical_matrix(
+            floating_sitk.GetDirection(),
+            floating_sitk.GetSpacing(),
+            floating_sitk.GetOrigin(),
+        )
+        output_matrix = _get_index_to_physical_matrix(
+            resampler.GetOutputDirection(),
+            resampler.GetOutputSpacing(),
+            resampler.GetOutputOrigin(),
+        )
+        input_from_output = np.linalg.solve(input_matrix, output_matrix)
+        function = _resample_linear if interpolation == 'linear' else _resample_nearest
+        resampled = function(tensor, input_from_output, resampler.GetSize())
+        array = resampled.to(tensor.dtype).cpu().numpy()
+        affine = get_ras_affine_from_sitk_metadata(
+            resampler.GetOutputSpacing(),
+            resampler.GetOutputDirection(),
+            resampler.GetOutputOrigin(),
+        )
+        return array, affine
+
+    @staticmethod
+    def _get_cache_key(
+        resampler: sitk.ResampleImageFilter,
+        floating_sitk: sitk.Image,
+        use_torch: bool,
+    ) -> str:
+        metadata = (
+            use_torch,
+            floating_sitk.GetSize(),
+            floating_sitk.GetSpacing(),
+            floating_sitk.GetOrigin(),
+            floating_sitk.GetDirection(),
+            floating_sitk.GetPixelIDValue(),
+            floating_sitk.GetNumberOfComponentsPerPixel(),
+            resampler.GetInterpolator(),
+            resampler.GetDefaultPixelValue(),
+            resampler.GetSize(),
+            resampler.GetOutputSpacing(),
+            resampler.GetOutputOrigin(),
+            resampler.GetOutputDirection(),
+        )
+        hasher = hashlib.blake2b(repr(metadata).encode(), digest_size=16)
+        hasher.update(sitk.GetArrayViewFromImage(floating_sitk))
+        return hasher.hexdigest()
+
+    def _get_cache_paths(self, cache_key: str) -> Tuple[Path, Path]:
+        assert self.cache_dir is not None
+        cache_dir = Path(self.cache_dir).expanduser()
+        data_path = cache_dir / f'{cache_key}.npy'
+        affine_path = cache_dir / f'{cache_key}_affine.npy'
+        return data_path, affine_path
+
+    def _load_from_cache(
+        self,
+        cache_key: str,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        data_path, affine_path = self._get_cache_paths(cache_key)
+        # The data is written last, so the affine exists if the data exists
+        if not data_path.is_file():
+            return None
+        # Copy-on-write mapping, so the file is not modified
+        array = np.load(data_path, mmap_mode='c')
+        affine = np.load(affine_path)
+        return array, affine
+
+    def _save_to_cache(
+        self,
+        cache_key: str,
+        array: np.ndarray,
+        affine: np.ndarray,
+    ) -> None:
+        data_path, affine_path = self._get_cache_paths(cache_key)
+        cache_dir = data_path.parent
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Files are written under a temporary name and then renamed, so that
+        # other processes never read incomplete files
+        for path, values in ((affine_path, affine), (data_path, array)):
+            file_descriptor, temp_path = tempfile.mkstemp(
+                dir=cache_dir,
+                suffix='.tmp',
+            )
+            with os.fdopen(file_descriptor, 'wb') as f:
+                np.save(f, values)
+            os.replace(temp_path, path)
+
+    def _set_resampler_output_space(
+        self,
+        resampler: sitk.ResampleImageFilter,
+        floating_sitk: sitk.Image,
+        subject: Subject,
+    ) -> None:
+        # Targets that do not depend on the subject are parsed only once, and
+        # again only if a different target is assigned to the transform
+        target = self.target
+        if self._parsed_target is None or self._parsed_target[0] is not target:
+            self._parsed_target = target, self._parse_constant_target(target)
+        spacing, output_space = self._parsed_target[1]
+        if spacing is not None:
+            self._set_resampler_from_parsed_spacing(resampler, spacing, floating_sitk)
+        elif output_space is not None:
+            self._set_resampler_output(resampler, *output_space)
+        else:
             self._set_resampler_reference(
                 resampler,
-                self.target,  # type: ignore[arg-type]
+                target,  # type: ignore[arg-type]
                 floating_sitk,
                 subject,
             )
-            resampled = resampler.Execute(floating_sitk)
 
-            array, affine = sitk_to_nib(resampled)
-            image.set_data(torch.as_tensor(array))
-            image.affine = affine
-        return subject
+    def _parse_constant_target(self, target) -> TypeConstantTarget:
+        """Parse a target that defines the output space by itself.
+
+        Returns:
+            Tuple with the output spacing, if the target is a spacing, and the
+            output size, origin, spacing and direction, if the target is a
+            tuple ``(spatial_shape, affine)`` or the path to an existing file.
+            Both are ``None`` if the target is an image or the name of an
+            image.
+        """
+        if isinstance(target, (str, Path)) and Path(target).is_file():
+            # Read the header only once instead of for every image
+            reference = ScalarImage(target)
+            return self._parse_constant_target(
+                (reference.spatial_shape, reference.affine),
+            )
+        elif isinstance(target, (str, Path, Image)):
+            return None, None
+        elif isinstance(target, Number):  # one number for target was passed
+            spacing = tuple(float(s) for s in self._parse_spacing(target))
+            return spacing, None  # type: ignore[return-value]
+        elif isinstance(target, Iterable) and len(target) == 2:
+            shape, affine = target
+            if not (isinstance(shape, Sized) and len(shape) == 3):
+                message = (
+                    'Target shape must be a sequence of three integers, but'
+                    f' "{shape}" was passed'
+                )
+                raise RuntimeError(message)
+            if not affine.shape == (4, 4):
+                message = (
+                    'Target affine must have shape (4, 4) but the following'
+                    f' was passed:\n{shape}'
+                )
+                raise RuntimeError(message)
+            origin, spacing, direction = get_sitk_metadata_from_ras_affine(affine)
+            return None, (shape, origin, spacing, direction)
+        elif isinstance(target, Iterable) and len(target) == 3:
+            spacing = tuple(float(s) for s in self._parse_spacing(target))
+            return spacing, None  # type: ignore[return-value]
+        else:
+            raise RuntimeError(f'Target not understood: "{target}"')
 
     def _set_resampler_reference(
         self,
@@ -217,7 +558,6 @@ class Resample(SpatialTransform):
         # 1) An instance of torchio.Image
         # 2) An instance of pathlib.Path
         # 3) A string, which could be a path or an image in subject
-        # 3) A string, which could be a path or an image in subject
         # 4) A number or sequence of numbers for spacing
         # 5) A tuple of shape, affine
         # The fourth case is the different one
@@ -244,71 +584,69 @@ class Resample(SpatialTransform):
                 image.spatial_shape,
                 image.affine,
             )
-        elif isinstance(target, Number):  # one number for target was passed
-            self._set_resampler_from_spacing(resampler, target, floating_sitk)
-        elif isinstance(target, Iterable) and len(target) == 2:
-            assert not isinstance(target, str)  # for mypy
-            shape, affine = target
-            if not (isinstance(shape, Sized) and len(shape) == 3):
-                message = (
-                    'Target shape must be a sequence of three integers, but'
-                    f' "{shape}" was passed'
-                )
-                raise RuntimeError(message)
-            if not affine.shape == (4, 4):
-                message = (
-                    'Target affine must have shape (4, 4) but the following'
-                    f' was passed:\n{shape}'
-                )
-                raise RuntimeError(message)
-            self._set_resampler_from_shape_affine(
-                resampler,
-                shape,
-                affine,
-            )
-        elif isinstance(target, Iterable) and len(target) == 3:
-            self._set_resampler_from_spacing(resampler, target, floating_sitk)
+            return
+        spacing, output_space = self._parse_constant_target(target)
+        if spacing is not None:
+            self._set_resampler_from_parsed_spacing(resampler, spacing, floating_sitk)
         else:
-            raise RuntimeError(f'Target not understood: "{target}"')
+            assert output_space is not None  # for mypy
+            self._set_resampler_output(resampler, *output_space)
 
     def _set_resampler_from_shape_affine(self, resampler, shape, affine):
         origin, spacing, direction = get_sitk_metadata_from_ras_affine(affine)
+        self._set_resampler_output(resampler, shape, origin, spacing, direction)
+
+    @staticmethod
+    def _set_resampler_output(resampler, size, origin, spacing, direction):
         resampler.SetOutputDirection(direction)
         resampler.SetOutputOrigin(origin)
         resampler.SetOutputSpacing(spacing)
-        resampler.SetSize(shape)
+        resampler.SetSize(size)
 
-    def _set_resampler_from_spacing(self, resampler, target, floating_sitk):
-        target_spacing = self._parse_spacing(target)
-        reference_image = self.get_reference_image(
+    def _set_resampler_from_parsed_spacing(self, resampler, spacing, floating_sitk):
+        # Setting the output geometry directly avoids allocating a reference
+        size, new_spacing, origin = self._get_reference_geometry(
             floating_sitk,
-            target_spacing,
+            spacing,
+        )
+        self._set_resampler_output(
+            resampler,
+            size,
+            origin,
+            new_spacing,
+            floating_sitk.GetDirection(),
+        )
+
+    @staticmethod
+    def _get_reference_geometry(
+        floating_sitk: sitk.Image,
+        spacing: TypeTripletFloat,
+    ) -> Tuple[Tuple[int, ...], Tuple[float, ...], Tuple[float, ...]]:
+        return _compute_reference_geometry(
+            floating_sitk.GetSize(),
+            floating_sitk.GetSpacing(),
+            floating_sitk.GetDirection(),
+            floating_sitk.GetOrigin(),
+            tuple(float(s) for s in spacing),
         )
-        resampler.SetReferenceImage(reference_image)
 
     @staticmethod
     def get_reference_image(
         floating_sitk: sitk.Image,
         spacing: TypeTripletFloat,
     ) -> sitk.Image:
-        old_spacing = np.array(floating_sitk.GetSpacing())
-        new_spacing = np.array(spacing)
-        old_size = np.array(floating_sitk.GetSize())
-        new_size = old_size * old_spacing / new_spacing
-        new_size = np.ceil(new_size).astype(np.uint16)
-        new_size[old_size == 1] = 1  # keep singleton dimensions
-        new_origin_index = 0.5 * (new_spacing / old_spacing - 1)
-        new_origin_lps = floating_sitk.TransformContinuousIndexToPhysicalPoint(
-            new_origin_index,
+        size, new_spacing, origin = Resample._get_reference_geometry(
+            floating_sitk,
+            spacing,
         )
         reference = sitk.Image(
-            new_size.tolist(),
+            size,
             floating_sitk.GetPixelID(),
             floating_sitk.GetNumberOfComponentsPerPixel(),
         )
         reference.SetDirection(floating_sitk.GetDirection())
-        reference.SetSpacing(new_spacing.tolist())
-        reference.SetOrigin(new_origin_lps)
+        reference.SetSpacing(new_spacing)
+        reference.SetOrigin(origin)
         return reference
 
     @staticmethod
@@ -322,3 +660,123 @@ class Resample(SpatialTransform):
         variance = (k**2 - 1**2) * (2 * np.sqrt(2 * np.log(2))) ** (-2)
         sigma = spacing * np.sqrt(variance)
         return sigma
+
+
+@lru_cache(maxsize=128)
+def _compute_reference_geometry(
+    old_size: Tuple[int, ...],
+    old_spacing: Tuple[float, ...],
+    direction: Tuple[float, ...],
+    old_origin: Tuple[float, ...],
+    spacing: Tuple[float, ...],
+) -> Tuple[Tuple[int, ...], Tuple[float, ...], Tuple[float, ...]]:
+    """Compute size, spacing and origin of the resampled image.
+
+    The result only depends on the geometry of the input image, so it is cached
+    for datasets in which many images share the same geometry.
+    """
+    old_spacing_array = np.array(old_spacing)
+    new_spacing = np.array(spacing)
+    old_size_array = np.array(old_size)
+    new_size = old_size_array * old_spacing_array / new_spacing
+    new_size = np.ceil(new_size).astype(np.uint16)
+    new_size[old_size_array == 1] = 1  # keep singleton dimensions
+    new_origin_index = 0.5 * (new_spacing / old_spacing_array - 1)
+    # Same as TransformContinuousIndexToPhysicalPoint(new_origin_index)
+    num_dimensions = len(old_size)
+    direction_matrix = np.array(direction).reshape(num_dimensions, num_dimensions)
+    new_origin_lps = old_origin + direction_matrix @ (
+        old_spacing_array * new_origin_index
+    )
+    return (
+        tuple(new_size.tolist()),
+        tuple(new_spacing.tolist()),
+        tuple(new_origin_lps.tolist()),
+    )
+
+
+def _get_index_to_physical_matrix(
+    direction: Sequence[float],
+    spacing: Sequence[float],
+    origin: Sequence[float],
+) -> np.ndarray:
+    matrix = np.eye(4)
+    matrix[:3, :3] = np.reshape(direction, (3, 3)) * np.array(spacing)
+    matrix[:3, 3] = origin
+    return matrix
+
+
+def _get_index_to_normalized_matrix(size: Sequence[int]) -> np.ndarray:
+    # Normalized coordinates are in [-1, 1] (align_corners=True) and reversed,
+    # as the first coordinate of a sampling grid indexes the last dimension
+    matrix = np.zeros((4, 4))
+    matrix[3, 3] = 1
+    for row, axis in enumerate(reversed(range(3))):
+        matrix[row, axis] = 2 / (size[axis] - 1)
+        matrix[row, 3] = -1
+    return matrix
+
+
+def _is_inside(indices: torch.Tensor, size: torch.Tensor) -> torch.Tensor:
+    # Same criterion as SimpleITK, which uses the default value outside
+    return ((indices >= -0.5) & (indices < size - 0.5)).all(dim=-1)
+
+
+def _resample_linear(
+    tensor: torch.Tensor,
+    input_from_output: np.ndarray,
+    output_size: Sequence[int],
+) -> torch.Tensor:
+    input_size = tensor.shape[1:]
+    # Sampling grids use normalized coordinates, in reverse order
+    theta = (
+        _get_index_to_normalized_matrix(input_size)
+        @ input_from_output
+        @ np.linalg.inv(_get_index_to_normalized_matrix(output_size))
+    )
+    float_types = torch.float32, torch.float64
+    dtype = tensor.dtype if tensor.dtype in float_types else torch.float64
+    theta_tensor = torch.as_tensor(theta[:3], dtype=dtype, device=tensor.device)
+    grid = F.affine_grid(
+        theta_tensor[np.newaxis],
+        [1, len(tensor), *output_size],
+        align_corners=True,
+    )
+    # Like SimpleITK, use the closest voxels near the borders
+    resampled = F.grid_sample(
+        tensor.to(dtype)[np.newaxis],
+        grid,
+        padding_mode='border',
+        align_corners=True,
+    )[0]
+    sizes = torch.as_tensor(input_size[::-1], dtype=dtype, device=tensor.device)
+    indices = (grid[0] + 1) / 2 * (sizes - 1)
+    resampled *= _is_inside(indices, sizes)
+    return resampled
+
+
+def _resample_nearest(
+    tensor: torch.Tensor,
+    input_from_output: np.ndarray,
+    output_size: Sequence[int],
+) -> torch.Tensor:
+    # Voxels are gathered instead of using grid_sample, which rounds half to
+    # even, while SimpleITK rounds half up. Ties are common, e.g. when the
+    # spacing is doubled
+    device = tensor.device
+    size_i, size_j, size_k = output_size
+    resampled = tensor.new_empty((len(tensor), size_i, size_j, size_k))
+    j = torch.arange(size_j, dtype=torch.float64, device=device)[:, np.newaxis]
+    k = torch.arange(size_k, dtype=torch.float64, device=device)[np.newaxis]
+    # The indices are computed one slab at a time to bound the memory used
+    for i in range(size_i):
+        inside = torch.ones(size_j, size_k, dtype=torch.bool, device=device)
+        slab_indices = []
+        for row, input_size in zip(input_from_output[:3], tensor.shape[1:]):
+            offset = i * row[0] + row[3]
+            indices = offset + j * row[1] + k * row[2]
+            inside &= (indices >= -0.5) & (indices < input_size - 0.5)
+            rounded = torch.floor(indices + 0.5).long()
+            slab_indices.append(rounded.clamp(0, input_size - 1))
+        resampled[:, i] = tensor[(slice(None), *slab_indices)] * inside
+    return resampled
@@ -14,6 +14,43 @@ class TestWeightedSampler(TorchioTestCase):
         patch = tio.utils.get_first_item(sampler(subject))
         assert tuple(patch[tio.LOCATION][:3]) == (1, 1, 1)
 
+    def test_num_patches(self):
+        subject = self.get_sample((1, 7, 7, 7))
+        sampler = WeightedSampler(5, 'prob')
+        patches = list(sampler(subject, num_patches=3))
+        assert len(patches) == 3
+        for patch in patches:
+            assert tuple(patch[tio.LOCATION][:3]) == (1, 1, 1)
+
+    def test_num_patches_random_state(self):
+        # Each center is drawn right before its patch is cropped, as cropping
+        # also draws from the random number generator
+        subject = self.get_sample((1, 7, 7, 7))
+        subject.prob.set_data(torch.rand(1, 7, 7, 7))
+        sampler = WeightedSampler(3, 'prob')
+        torch.manual_seed(5)
+        patches = list(sampler(subject, num_patches=4))
+        probability_map = sampler.process_probability_map(subject.prob.data, subject)
+        cdf = sampler.get_cumulative_distribution_function(probability_map)
+        torch.manual_seed(5)
+        expected = []
+        for _ in range(4):
+            center = sampler.sample_probability_map(probability_map, cdf)
+            torch.rand(1)  # drawn by the crop transform
+            expected.append(tuple(center - 1))
+        locations = [tuple(patch[tio.LOCATION][:3].tolist()) for patch in patches]
+        assert locations == expected
+
+    def test_float64_tiny_probabilities(self):
+        subject = self.get_sample((1, 7, 7, 7))
+        prob = torch.zeros(1, 7, 7, 7, dtype=torch.float64)
+        prob[0, 3, 3, 3] = 1e-50
+        prob[0, 3, 3, 4] = 1e-46
+        subject.prob.set_data(prob)
+        sampler = WeightedSampler(5, 'prob')
+        patch = tio.utils.get_first_item(sampler(subject))
+        assert tuple(patch[tio.LOCATION][:2]) == (1, 1)
+
     def get_sample(self, image_shape):
         t1 = torch.rand(*image_shape)
         prob = torch.zeros_like(t1)
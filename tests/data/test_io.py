@@ -112,6 +112,14 @@ class TestIO(TorchioTestCase):
         tensor, _ = io.sitk_to_nib(image)
         assert data.sum() == pytest.approx(tensor.sum())
 
+    def test_sitk_to_nib_without_copy(self):
+        data = np.random.rand(10, 12)
+        image = sitk.GetImageFromArray(data)
+        array, _ = io._sitk_to_nib_without_copy(image)
+        del image  # the array must keep the buffer alive
+        tensor = torch.as_tensor(array)
+        assert data.sum() == pytest.approx(tensor.sum())
+
     def test_sitk_to_affine(self):
         spacing = 1, 2, 3
         direction_lps = -1, 0, 0, 0, -1, 0, 0, 0, 1
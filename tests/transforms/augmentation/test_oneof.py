@@ -39,3 +39,12 @@ class TestOneOf(TorchioTestCase):
             }
         )
         transform(self.sample_subject)
+
+    def test_normalized_probabilities(self):
+        transforms = {
+            tio.RandomAffine(): 3,
+            tio.RandomElasticDeformation(): 1,
+        }
+        transform = tio.OneOf(transforms)
+        probabilities = list(transform.transforms_dict.values())
+        assert probabilities == [0.75, 0.25]
@@ -1,4 +1,10 @@
+import os
+from unittest import mock
+
+import numpy as np
 import pytest
+import torch
+import torchio as tio
 from torchio import RandomMotion
 
 from ...utils import TorchioTestCase
@@ -35,6 +41,45 @@ class TestRandomMotion(TorchioTestCase):
             transformed.t1.data,
         )
 
+    def test_multithreaded(self):
+        transform = RandomMotion(num_transforms=2)
+        torch.manual_seed(0)
+        expected = transform(self.sample_subject).t1.data
+        torch.manual_seed(0)
+        with mock.patch.dict(os.environ, {'TORCHIO_MOTION_NTHREADS': '4'}):
+            transformed = transform(self.sample_subject).t1.data
+        self.assert_tensor_equal(expected, transformed)
+
+    def test_wrong_num_threads(self):
+        transform = RandomMotion()
+        for value in ('0', 'two'):
+            with mock.patch.dict(os.environ, {'TORCHIO_MOTION_NTHREADS': value}):
+                with pytest.raises(ValueError):
+                    transform(self.sample_subject)
+
+    def test_add_artifact_deprecated(self):
+        motion = tio.Motion(
+            degrees=[[10, 0, 0]],
+            translation=[[0, 5, 0]],
+            times=[0.5],
+            image_interpolation='linear',
+        )
+        image = self.sample_subject.t1
+        expected = motion(image).data[0]
+        sitk_image = image.as_sitk()
+        transforms = motion.get_rigid_transforms(
+            np.array(motion.degrees),
+            np.array(motion.translation),
+        )
+        with pytest.warns(DeprecationWarning):
+            result = motion.add_artifact(
+                sitk_image,
+                transforms,
+                np.array(motion.times),
+                'linear',
+            )
+        self.assert_tensor_almost_equal(result, expected)
+
     def test_negative_degrees(self):
         with pytest.raises(ValueError):
             RandomMotion(degrees=-10)
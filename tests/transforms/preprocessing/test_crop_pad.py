@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+import torch
 import torchio as tio
 
 from ...utils import TorchioTestCase
@@ -211,3 +212,37 @@ class TestCropOrPad(TorchioTestCase):
             shape_a = crop(subject_a).image.shape
             shape_b = crop(subject_b).image.shape
             assert shape_a != shape_b
+
+    def test_same_as_pad_and_crop(self):
+        target_shape = 12, 18, 25
+        for padding_mode in (5, 'reflect'):
+            transform = tio.CropOrPad(target_shape, padding_mode=padding_mode)
+            transformed = transform(self.sample_subject)
+            history = transformed.applied_transforms
+            assert [name for name, _ in history] == ['Pad', 'Crop']
+            pad = tio.Pad(history[0][1]['padding'], padding_mode=padding_mode)
+            crop = tio.Crop(history[1][1]['cropping'])
+            expected = crop(pad(self.sample_subject))
+            for key in transformed:
+                self.assert_tensor_equal(transformed[key].data, expected[key].data)
+                self.assert_tensor_equal(
+                    transformed[key].affine,
+                    expected[key].affine,
+                )
+            inverse = transformed.apply_inverse_transform()
+            for key in inverse:
+                self.assert_tensor_equal(
+                    inverse[key].affine,
+                    self.sample_subject[key].affine,
+                )
+
+    def test_random_state_same_as_pad_and_crop(self):
+        target_shape = 12, 18, 25
+        torch.manual_seed(0)
+        tio.CropOrPad(target_shape)(self.sample_subject)
+        value = torch.rand(1)
+        torch.manual_seed(0)
+        torch.rand(1)  # drawn when calling CropOrPad
+        tio.Crop(1)(tio.Pad(1)(self.sample_subject))
+        expected = torch.rand(1)
+        self.assert_tensor_equal(value, expected)
@@ -1,3 +1,5 @@
+import pickle
+
 import numpy as np
 import pytest
 import torch
@@ -59,6 +61,16 @@ class TestResample(TorchioTestCase):
                 image.affine,
             )
 
+    def test_reference_path_read_once(self):
+        reference_image, reference_path = self.get_reference_image_and_path()
+        shape = reference_image.spatial_shape
+        transform = tio.Resample(reference_path)
+        transform(self.sample_subject)
+        reference_path.unlink()
+        transformed = transform(self.sample_subject)
+        for image in transformed.values():
+            assert image.spatial_shape == shape
+
     def test_wrong_spacing_length(self):
         with pytest.raises(RuntimeError):
             tio.Resample((1, 2))(self.sample_subject)
@@ -99,3 +111,101 @@ class TestResample(TorchioTestCase):
         transform = tio.Resample(target)
         with pytest.raises(RuntimeError):
             transform(self.sample_subject)
+
+    def test_target_modified(self):
+        transform = tio.Resample(1)
+        transform(self.sample_subject)
+        transform.target = 2
+        transformed = transform(self.sample_subject)
+        for image in transformed.get_images(intensity_only=False):
+            assert image.spacing == (2, 2, 2)
+
+    def test_cache_dir(self):
+        cache_dir = self.dir / 'cache'
+        transform = tio.Resample(2, cache_dir=cache_dir)
+        expected = tio.Resample(2)(self.sample_subject)
+        transformed = transform(self.sample_subject)
+        num_files = len(list(cache_dir.iterdir()))
+        assert num_files == 2 * len(self.sample_subject)
+        cached = transform(self.sample_subject)
+        assert len(list(cache_dir.iterdir())) == num_files
+        for key in expected:
+            self.assert_tensor_equal(transformed[key].data, expected[key].data)
+            self.assert_tensor_equal(cached[key].data, expected[key].data)
+            self.assert_tensor_equal(cached[key].affine, expected[key].affine)
+
+    def test_parse_spacing_string(self):
+        with pytest.raises(ValueError):
+            tio.Resample._parse_spacing('abc')
+
+    def test_pickle_after_use(self):
+        transform = tio.Resample(2)
+        expected = transform(self.sample_subject)
+        unpickled = pickle.loads(pickle.dumps(transform))
+        transformed = unpickled(self.sample_subject)
+        for key in expected:
+            self.assert_tensor_equal(transformed[key].data, expected[key].data)
+
+    def test_torch_backend(self):
+        subject = tio.Subject(
+            t1=tio.ScalarImage(tensor=torch.rand(2, 10, 12, 14)),
+            label=tio.LabelMap(tensor=torch.rand(1, 10, 12, 14) > 0.5),
+        )
+        cos = sin = np.sqrt(0.5)
+        rotation = np.array(
+            (
+                (cos, -sin, 0, 0.5),
+                (sin, cos, 0, 0),
+                (0, 0, 1, 1.5),
+                (0, 0, 0, 1),
+            ),
+        )
+        oblique_affine = rotation @ np.diag((2, 2, 2, 1))
+        # Positions exactly between two voxels, common with oblique targets,
+        # might be rounded differently, so a fraction of voxels may differ
+        targets_and_tolerances = (
+            ((0.7, 1.3, 2), 0),
+            (((7, 8, 9), oblique_affine), 0.1),
+        )
+        for target, tolerance in targets_and_tolerances:
+            for interpolation in ('linear', 'nearest'):
+                kwargs = {'image_interpolation': interpolation}
+                expected = tio.Resample(target, **kwargs)(subject)
+                transform = tio.Resample(target, backend='torch', **kwargs)
+                transformed = transform(subject)
+                for key in subject:
+                    close = torch.isclose(
+                        transformed[key].data.double(),
+                        expected[key].data.double(),
+                        atol=1e-5,
+                        rtol=0,
+                    )
+                    assert 1 - close.double().mean() <= tolerance
+                    self.assert_tensor_equal(
+                        transformed[key].affine,
+                        expected[key].affine,
+                    )
+
+    def test_wrong_backend(self):
+        with pytest.raises(ValueError):
+            tio.Resample(backend='numpy')
+
+    def test_output_dtype(self):
+        transform = tio.Resample(2, output_dtype=torch.float64)
+        transformed = transform(self.sample_subject)
+        for image in transformed.get_images(intensity_only=False):
+            if isinstance(image, tio.ScalarImage):
+                assert image.data.dtype == torch.float64
+            else:
+                assert image.data.dtype != torch.float64
+        # Transforms using SimpleITK can be applied to the cast images
+        tio.RandomAffine()(transformed)
+
+    def test_wrong_output_dtype(self):
+        with pytest.raises(TypeError):
+            tio.Resample(output_dtype='float16')
+
+    def test_unsupported_output_dtype(self):
+        for dtype in (torch.float16, torch.bfloat16):
+            with pytest.raises(ValueError):
+                tio.Resample(output_dtype=dtype)